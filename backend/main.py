@@ -8,8 +8,11 @@ import os
 
 from db import DatabaseManager
 from routers import database as database_router
+from routers import saved_queries as saved_queries_router
 from utils.crypto import crypto_manager
 from utils.connection_manager import connection_manager
+from utils.query_safety import check_query, is_read_only, split_statements
+from utils.saved_query_scheduler import saved_query_scheduler
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -27,6 +30,12 @@ async def on_startup():
     logger.info("Running database migrations...")
     await db_manager.run_migrations()
     logger.info("Database migrations completed")
+    saved_query_scheduler.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Run on application shutdown."""
+    await saved_query_scheduler.stop()
 
 # CORS
 app.add_middleware(
@@ -42,6 +51,7 @@ class QueryRequest(BaseModel):
     query: str
     limit: Optional[int] = None
     connection_id: Optional[int] = None
+    confirmed: bool = False
 
 class ColumnMetadata(BaseModel):
     name: str
@@ -57,6 +67,7 @@ class TableMetadata(BaseModel):
 
 # Include routers
 app.include_router(database_router.router)
+app.include_router(saved_queries_router.router)
 
 @app.post("/api/v1/query")
 async def run_query(
@@ -70,18 +81,30 @@ async def run_query(
             connection_id_header=connection_id_header
         )
         
-        # Get user database connection
-        conn = await connection_manager.get_user_connection(connection_id)
+        # Get user database connection; only reads may go to a replica
+        statements = split_statements(request.query)
+        is_read_only_query = len(statements) == 1 and is_read_only(statements[0])
+        config = await connection_manager.get_user_connection_config(connection_id)
+        conn = await connection_manager.get_user_connection(
+            connection_id, read_only=is_read_only_query, config=config
+        )
         try:
-            query_to_execute = request.query
-            if request.limit is not None and request.limit > 0:
-                query_to_execute += f" LIMIT {request.limit}"
+            # Reject or hold expensive queries and cap returned rows before running anything
+            query_to_execute = await check_query(
+                conn,
+                request.query,
+                limits=config,
+                requested_limit=request.limit,
+                is_confirmed=request.confirmed
+            )
             results = await conn.fetch(query_to_execute)
             columns = results[0].keys() if results else []
             data = [dict(row) for row in results]
             return {"columns": columns, "rows": data}
         finally:
             await conn.close()
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -98,7 +121,7 @@ async def get_tables_metadata(
         )
         
         # Get user database connection
-        conn = await connection_manager.get_user_connection(connection_id)
+        conn = await connection_manager.get_user_connection(connection_id, read_only=True)
         try:
             # Get all user tables in the public schema
             tables = await conn.fetch("""
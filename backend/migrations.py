@@ -64,5 +64,92 @@ migrations = [
     VALUES 
         ('sample_db', 'postgresql', 'sample-db', 5432, 'postgres', 'postgres', 'encrypted_password_placeholder', 'prefer')
     ON CONFLICT (name) DO NOTHING;
+    """,
+
+    # Migration 0003 - Add read replica hosts to database connections
+    """
+    -- How read-only traffic is spread across replicas, and how stale a replica may be
+    ALTER TABLE database_connections
+        ADD COLUMN IF NOT EXISTS replica_selection VARCHAR(50) DEFAULT 'least_outstanding',
+        ADD COLUMN IF NOT EXISTS max_replica_lag_seconds INTEGER;
+
+    ALTER TABLE database_connections
+        ADD CONSTRAINT valid_replica_selection CHECK (replica_selection IN ('least_outstanding', 'latency')),
+        ADD CONSTRAINT valid_max_replica_lag CHECK (max_replica_lag_seconds IS NULL OR max_replica_lag_seconds >= 0);
+
+    -- Additional hosts for a connection. The host/port on database_connections stays the primary.
+    CREATE TABLE IF NOT EXISTS database_connection_hosts (
+        id SERIAL PRIMARY KEY,
+        connection_id INTEGER NOT NULL REFERENCES database_connections(id) ON DELETE CASCADE,
+        host VARCHAR(255) NOT NULL,
+        port INTEGER NOT NULL,
+        role VARCHAR(20) NOT NULL DEFAULT 'replica',
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+
+        -- Basic validation for role
+        CONSTRAINT valid_host_role CHECK (role IN ('primary', 'replica')),
+        -- Basic validation for port
+        CONSTRAINT valid_host_port CHECK (port > 0 AND port < 65536),
+        CONSTRAINT unique_connection_host UNIQUE (connection_id, host, port)
+    );
+
+    -- Index on connection_id for fetching a connection's hosts
+    CREATE INDEX IF NOT EXISTS idx_database_connection_hosts_connection_id ON database_connection_hosts(connection_id);
+    """,
+
+    # Migration 0004 - Add query safety thresholds to database connections
+    """
+    -- Estimated cost/rows above which queries are gated (NULL disables), and a cap on returned rows
+    ALTER TABLE database_connections
+        ADD COLUMN IF NOT EXISTS max_query_cost DOUBLE PRECISION,
+        ADD COLUMN IF NOT EXISTS max_query_rows BIGINT,
+        ADD COLUMN IF NOT EXISTS max_result_rows INTEGER DEFAULT 10000,
+        ADD COLUMN IF NOT EXISTS cost_gate_action VARCHAR(20) DEFAULT 'reject';
+
+    ALTER TABLE database_connections
+        ADD CONSTRAINT valid_max_query_cost CHECK (max_query_cost IS NULL OR max_query_cost > 0),
+        ADD CONSTRAINT valid_max_query_rows CHECK (max_query_rows IS NULL OR max_query_rows > 0),
+        ADD CONSTRAINT valid_max_result_rows CHECK (max_result_rows IS NULL OR max_result_rows > 0),
+        ADD CONSTRAINT valid_cost_gate_action CHECK (cost_gate_action IN ('reject', 'confirm'));
+    """,
+
+    # Migration 0005 - Create saved_queries and saved_query_snapshots tables
+    """
+    -- Saved queries, optionally refreshed in the background on a fixed interval
+    CREATE TABLE IF NOT EXISTS saved_queries (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL UNIQUE,
+        connection_id INTEGER NOT NULL REFERENCES database_connections(id) ON DELETE CASCADE,
+        query TEXT NOT NULL,
+        refresh_interval_seconds INTEGER,  -- NULL means refresh on demand only
+        last_refresh_error TEXT,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        is_active BOOLEAN DEFAULT true,
+
+        -- Ensure name is lowercase and doesn't contain spaces
+        CONSTRAINT valid_saved_query_name CHECK (name ~ '^[a-z0-9_-]+$'),
+        -- Refreshing more often than once a minute defeats the point of a snapshot
+        CONSTRAINT valid_refresh_interval CHECK (refresh_interval_seconds IS NULL OR refresh_interval_seconds >= 60)
+    );
+
+    -- Trigger to automatically update updated_at
+    CREATE TRIGGER update_saved_queries_updated_at
+        BEFORE UPDATE ON saved_queries
+        FOR EACH ROW
+        EXECUTE FUNCTION update_updated_at_column();
+
+    -- Latest result of each saved query, stored as compressed JSON
+    CREATE TABLE IF NOT EXISTS saved_query_snapshots (
+        saved_query_id INTEGER PRIMARY KEY REFERENCES saved_queries(id) ON DELETE CASCADE,
+        columns TEXT[] NOT NULL,
+        data BYTEA NOT NULL,  -- zlib-compressed JSON array of row arrays
+        row_count INTEGER NOT NULL,
+        duration_ms INTEGER NOT NULL,
+        refreshed_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Index on is_active for filtering active saved queries
+    CREATE INDEX IF NOT EXISTS idx_saved_queries_is_active ON saved_queries(is_active);
     """
 ]
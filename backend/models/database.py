@@ -1,10 +1,28 @@
 """Database models for trove."""
 
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, SecretStr, Field, validator
 import re
 
+class ConnectionHost(BaseModel):
+    """Additional host for a database connection, e.g. a read replica."""
+    host: str = Field(..., description="Database host")
+    port: int = Field(..., description="Database port")
+    role: str = Field(default="replica", description="Host role (primary, replica)")
+
+    @validator('port')
+    def validate_port(cls, v):
+        if not 0 < v < 65536:
+            raise ValueError('port must be between 1 and 65535')
+        return v
+
+    @validator('role')
+    def validate_role(cls, v):
+        if v not in ('primary', 'replica'):
+            raise ValueError('role must be either primary or replica')
+        return v
+
 class DatabaseConnectionBase(BaseModel):
     """Base model for database connections."""
     name: str = Field(..., description="Unique identifier for the connection")
@@ -14,6 +32,13 @@ class DatabaseConnectionBase(BaseModel):
     database: str = Field(..., description="Database name")
     username: str = Field(..., description="Database username")
     ssl_mode: str = Field(default="prefer", description="SSL mode for connection")
+    hosts: List[ConnectionHost] = Field(default_factory=list, description="Additional hosts, e.g. read replicas")
+    replica_selection: str = Field(default="least_outstanding", description="How read-only traffic picks a replica (least_outstanding, latency)")
+    max_replica_lag_seconds: Optional[int] = Field(default=None, description="Skip replicas lagging further behind than this")
+    max_query_cost: Optional[float] = Field(default=None, description="Gate queries whose estimated planner cost exceeds this")
+    max_query_rows: Optional[int] = Field(default=None, description="Gate queries whose estimated row count exceeds this")
+    max_result_rows: Optional[int] = Field(default=10000, description="Server-side cap on rows returned by SELECT queries")
+    cost_gate_action: str = Field(default="reject", description="What to do with gated queries (reject, confirm)")
 
     @validator('name')
     def validate_name(cls, v):
@@ -40,6 +65,39 @@ class DatabaseConnectionBase(BaseModel):
             raise ValueError(f'ssl_mode must be one of: {", ".join(valid_modes)}')
         return v
 
+    @validator('replica_selection')
+    def validate_replica_selection(cls, v):
+        if v not in ('least_outstanding', 'latency'):
+            raise ValueError('replica_selection must be either least_outstanding or latency')
+        return v
+
+    @validator('max_replica_lag_seconds')
+    def validate_max_replica_lag_seconds(cls, v):
+        if v is not None and v < 0:
+            raise ValueError('max_replica_lag_seconds must not be negative')
+        return v
+
+    @validator('hosts')
+    def validate_hosts(cls, v):
+        if v is None:
+            return v
+        addresses = [(h.host, h.port) for h in v]
+        if len(addresses) != len(set(addresses)):
+            raise ValueError('hosts must not contain the same host and port twice')
+        return v
+
+    @validator('max_query_cost', 'max_query_rows', 'max_result_rows')
+    def validate_positive_limit(cls, v):
+        if v is not None and v <= 0:
+            raise ValueError('query limits must be positive')
+        return v
+
+    @validator('cost_gate_action')
+    def validate_cost_gate_action(cls, v):
+        if v not in ('reject', 'confirm'):
+            raise ValueError('cost_gate_action must be either reject or confirm')
+        return v
+
 class DatabaseConnectionCreate(DatabaseConnectionBase):
     """Model for creating a new database connection."""
     password: SecretStr = Field(..., description="Database password")
@@ -54,6 +112,13 @@ class DatabaseConnectionUpdate(DatabaseConnectionBase):
     username: Optional[str] = None
     password: Optional[SecretStr] = None
     ssl_mode: Optional[str] = None
+    hosts: Optional[List[ConnectionHost]] = None
+    replica_selection: Optional[str] = None
+    max_replica_lag_seconds: Optional[int] = None
+    max_query_cost: Optional[float] = None
+    max_query_rows: Optional[int] = None
+    max_result_rows: Optional[int] = None
+    cost_gate_action: Optional[str] = None
 
 class DatabaseConnectionResponse(DatabaseConnectionBase):
     """Model for database connection responses."""
@@ -0,0 +1,65 @@
+"""Saved query models for trove."""
+
+from datetime import datetime
+from typing import Any, List, Optional
+from pydantic import BaseModel, Field, validator
+import re
+
+class SavedQueryBase(BaseModel):
+    """Base model for saved queries."""
+    name: str = Field(..., description="Unique identifier for the saved query")
+    connection_id: int = Field(..., description="Database connection the query runs against")
+    query: str = Field(..., description="SQL to run")
+    refresh_interval_seconds: Optional[int] = Field(default=None, description="Background refresh interval, None for on demand only")
+
+    @validator('name')
+    def validate_name(cls, v):
+        if not re.match(r'^[a-z0-9_-]+$', v):
+            raise ValueError('name must be lowercase and contain only letters, numbers, underscores, and hyphens')
+        return v
+
+    @validator('query')
+    def validate_query(cls, v):
+        if not v.strip():
+            raise ValueError('query must not be empty')
+        return v
+
+    @validator('refresh_interval_seconds')
+    def validate_refresh_interval_seconds(cls, v):
+        if v is not None and v < 60:
+            raise ValueError('refresh_interval_seconds must be at least 60')
+        return v
+
+class SavedQueryCreate(SavedQueryBase):
+    """Model for creating a new saved query."""
+
+class SavedQueryUpdate(SavedQueryBase):
+    """Model for updating an existing saved query."""
+    name: Optional[str] = None
+    connection_id: Optional[int] = None
+    query: Optional[str] = None
+    refresh_interval_seconds: Optional[int] = None
+
+class SavedQueryResponse(SavedQueryBase):
+    """Model for saved query responses."""
+    id: int
+    last_refreshed_at: Optional[datetime] = None
+    last_refresh_error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    is_active: bool
+
+    class Config:
+        from_attributes = True
+
+class SavedQueryResult(BaseModel):
+    """Latest snapshot of a saved query with staleness metadata."""
+    saved_query_id: int
+    columns: List[str]
+    rows: List[List[Any]]
+    row_count: int
+    duration_ms: int
+    refreshed_at: datetime
+    age_seconds: float
+    is_stale: bool
+    last_refresh_error: Optional[str] = None
@@ -1,12 +1,13 @@
 """Database connection management endpoints."""
 
 from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from typing import Dict, List
 import asyncpg
 import logging
 import os
 
 from models.database import (
+    ConnectionHost,
     DatabaseConnectionCreate,
     DatabaseConnectionUpdate,
     DatabaseConnectionResponse
@@ -25,6 +26,39 @@ async def get_db():
     finally:
         await conn.close()
 
+async def fetch_hosts(
+    db: asyncpg.Connection,
+    connection_ids: List[int]
+) -> Dict[int, List[ConnectionHost]]:
+    """Fetch additional hosts for the given connections, keyed by connection id."""
+    rows = await db.fetch("""
+        SELECT connection_id, host, port, role
+        FROM database_connection_hosts
+        WHERE connection_id = ANY($1::int[])
+        ORDER BY id
+    """, connection_ids)
+    hosts: Dict[int, List[ConnectionHost]] = {}
+    for row in rows:
+        hosts.setdefault(row['connection_id'], []).append(
+            ConnectionHost(host=row['host'], port=row['port'], role=row['role'])
+        )
+    return hosts
+
+async def replace_hosts(
+    db: asyncpg.Connection,
+    connection_id: int,
+    hosts: List[ConnectionHost]
+) -> None:
+    """Replace the additional hosts of a connection."""
+    await db.execute(
+        "DELETE FROM database_connection_hosts WHERE connection_id = $1",
+        connection_id
+    )
+    await db.executemany("""
+        INSERT INTO database_connection_hosts (connection_id, host, port, role)
+        VALUES ($1, $2, $3, $4)
+    """, [(connection_id, h.host, h.port, h.role) for h in hosts])
+
 @router.post("/", response_model=DatabaseConnectionResponse)
 async def create_connection(
     connection: DatabaseConnectionCreate,
@@ -40,19 +74,28 @@ async def create_connection(
         )
         
         # Insert into database
-        result = await db.fetchrow("""
-            INSERT INTO database_connections (
-                name, connection_type, host, port, database,
-                username, password, ssl_mode
-            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
-            RETURNING id, name, connection_type, host, port,
-                      database, username, ssl_mode, created_at,
-                      updated_at, is_active
-        """, connection.name, connection.connection_type,
-             connection.host, connection.port, connection.database,
-             connection.username, encrypted_password, connection.ssl_mode)
+        async with db.transaction():
+            result = await db.fetchrow("""
+                INSERT INTO database_connections (
+                    name, connection_type, host, port, database,
+                    username, password, ssl_mode, replica_selection,
+                    max_replica_lag_seconds, max_query_cost, max_query_rows,
+                    max_result_rows, cost_gate_action
+                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
+                RETURNING id, name, connection_type, host, port,
+                          database, username, ssl_mode, replica_selection,
+                          max_replica_lag_seconds, max_query_cost, max_query_rows,
+                          max_result_rows, cost_gate_action, created_at,
+                          updated_at, is_active
+            """, connection.name, connection.connection_type,
+                 connection.host, connection.port, connection.database,
+                 connection.username, encrypted_password, connection.ssl_mode,
+                 connection.replica_selection, connection.max_replica_lag_seconds,
+                 connection.max_query_cost, connection.max_query_rows,
+                 connection.max_result_rows, connection.cost_gate_action)
+            await replace_hosts(db, result['id'], connection.hosts)
         
-        return DatabaseConnectionResponse(**dict(result))
+        return DatabaseConnectionResponse(**dict(result), hosts=connection.hosts)
     except asyncpg.UniqueViolationError:
         raise HTTPException(
             status_code=400,
@@ -74,7 +117,9 @@ async def list_connections(
     try:
         query = """
             SELECT id, name, connection_type, host, port,
-                   database, username, ssl_mode, created_at,
+                   database, username, ssl_mode, replica_selection,
+                   max_replica_lag_seconds, max_query_cost, max_query_rows,
+                   max_result_rows, cost_gate_action, created_at,
                    updated_at, is_active
             FROM database_connections
         """
@@ -83,7 +128,11 @@ async def list_connections(
         query += " ORDER BY name"
         
         results = await db.fetch(query)
-        return [DatabaseConnectionResponse(**dict(row)) for row in results]
+        hosts = await fetch_hosts(db, [row['id'] for row in results])
+        return [
+            DatabaseConnectionResponse(**dict(row), hosts=hosts.get(row['id'], []))
+            for row in results
+        ]
     except Exception as e:
         logger.error(f"Error listing database connections: {e}")
         raise HTTPException(
@@ -100,7 +149,9 @@ async def get_connection(
     try:
         result = await db.fetchrow("""
             SELECT id, name, connection_type, host, port,
-                   database, username, ssl_mode, created_at,
+                   database, username, ssl_mode, replica_selection,
+                   max_replica_lag_seconds, max_query_cost, max_query_rows,
+                   max_result_rows, cost_gate_action, created_at,
                    updated_at, is_active
             FROM database_connections
             WHERE id = $1 AND is_active = true
@@ -112,7 +163,8 @@ async def get_connection(
                 detail=f"Connection {connection_id} not found"
             )
         
-        return DatabaseConnectionResponse(**dict(result))
+        hosts = await fetch_hosts(db, [connection_id])
+        return DatabaseConnectionResponse(**dict(result), hosts=hosts.get(connection_id, []))
     except HTTPException:
         raise
     except Exception as e:
@@ -146,6 +198,8 @@ async def update_connection(
         updates = []
         params = []
         update_data = connection.model_dump(exclude_unset=True)
+        # Hosts live in their own table and are replaced wholesale
+        new_hosts = update_data.pop('hosts', None)
         
         for i, (key, value) in enumerate(update_data.items(), start=1):
             if key == 'password':
@@ -154,23 +208,30 @@ async def update_connection(
             updates.append(f"{key} = ${i}")
             params.append(value)
         
-        if not updates:
-            return DatabaseConnectionResponse(**dict(existing))
-        
-        # Add connection_id as the last parameter
-        params.append(connection_id)
-        
-        # Execute update
-        result = await db.fetchrow(f"""
-            UPDATE database_connections
-            SET {", ".join(updates)}
-            WHERE id = ${len(params)}
-            RETURNING id, name, connection_type, host, port,
-                      database, username, ssl_mode, created_at,
-                      updated_at, is_active
-        """, *params)
+        async with db.transaction():
+            if new_hosts is not None:
+                await replace_hosts(db, connection_id, connection.hosts)
+            
+            result = existing
+            if updates:
+                # Add connection_id as the last parameter
+                params.append(connection_id)
+                
+                # Execute update
+                result = await db.fetchrow(f"""
+                    UPDATE database_connections
+                    SET {", ".join(updates)}
+                    WHERE id = ${len(params)}
+                    RETURNING id, name, connection_type, host, port,
+                              database, username, ssl_mode, replica_selection,
+                              max_replica_lag_seconds, max_query_cost, max_query_rows,
+                              max_result_rows, cost_gate_action, created_at,
+                              updated_at, is_active
+                """, *params)
+            
+            hosts = await fetch_hosts(db, [connection_id])
         
-        return DatabaseConnectionResponse(**dict(result))
+        return DatabaseConnectionResponse(**dict(result), hosts=hosts.get(connection_id, []))
     except asyncpg.UniqueViolationError:
         raise HTTPException(
             status_code=400,
@@ -0,0 +1,296 @@
+"""Saved query endpoints, served from materialized snapshots."""
+
+from fastapi import APIRouter, Depends, HTTPException
+from typing import List
+import asyncio
+import asyncpg
+import logging
+
+from models.saved_query import (
+    SavedQueryCreate,
+    SavedQueryUpdate,
+    SavedQueryResponse,
+    SavedQueryResult
+)
+from routers.database import get_db
+from utils.saved_query_scheduler import decode_rows, saved_query_scheduler
+
+router = APIRouter(prefix="/api/v1/saved-queries", tags=["saved-queries"])
+logger = logging.getLogger(__name__)
+
+SAVED_QUERY_SELECT = """
+    SELECT q.id, q.name, q.connection_id, q.query, q.refresh_interval_seconds,
+           q.last_refresh_error, s.refreshed_at AS last_refreshed_at,
+           q.created_at, q.updated_at, q.is_active
+    FROM saved_queries q
+    LEFT JOIN saved_query_snapshots s ON s.saved_query_id = q.id
+"""
+
+async def fetch_saved_query(db: asyncpg.Connection, saved_query_id: int) -> SavedQueryResponse:
+    """Fetch an active saved query or raise 404."""
+    result = await db.fetchrow(
+        SAVED_QUERY_SELECT + " WHERE q.id = $1 AND q.is_active = true",
+        saved_query_id
+    )
+    if not result:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Saved query {saved_query_id} not found"
+        )
+    return SavedQueryResponse(**dict(result))
+
+async def ensure_active_connection(db: asyncpg.Connection, connection_id: int) -> None:
+    """Raise 400 unless the connection exists and hasn't been deleted."""
+    is_active = await db.fetchval(
+        "SELECT is_active FROM database_connections WHERE id = $1",
+        connection_id
+    )
+    if not is_active:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Connection {connection_id} not found"
+        )
+
+@router.post("/", response_model=SavedQueryResponse)
+async def create_saved_query(
+    saved_query: SavedQueryCreate,
+    db: asyncpg.Connection = Depends(get_db)
+):
+    """Create a new saved query."""
+    try:
+        await ensure_active_connection(db, saved_query.connection_id)
+
+        result = await db.fetchrow("""
+            INSERT INTO saved_queries (
+                name, connection_id, query, refresh_interval_seconds
+            ) VALUES ($1, $2, $3, $4)
+            RETURNING id
+        """, saved_query.name, saved_query.connection_id,
+             saved_query.query, saved_query.refresh_interval_seconds)
+
+        return await fetch_saved_query(db, result['id'])
+    except asyncpg.UniqueViolationError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Saved query with name '{saved_query.name}' already exists"
+        )
+    except asyncpg.ForeignKeyViolationError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Connection {saved_query.connection_id} not found"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating saved query: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Error creating saved query"
+        )
+
+@router.get("/", response_model=List[SavedQueryResponse])
+async def list_saved_queries(
+    db: asyncpg.Connection = Depends(get_db),
+    connection_id: int = None
+):
+    """List active saved queries, optionally for one connection."""
+    try:
+        query = SAVED_QUERY_SELECT + " WHERE q.is_active = true"
+        params = []
+        if connection_id is not None:
+            query += " AND q.connection_id = $1"
+            params.append(connection_id)
+        query += " ORDER BY q.name"
+
+        results = await db.fetch(query, *params)
+        return [SavedQueryResponse(**dict(row)) for row in results]
+    except Exception as e:
+        logger.error(f"Error listing saved queries: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Error listing saved queries"
+        )
+
+@router.get("/{saved_query_id}", response_model=SavedQueryResponse)
+async def get_saved_query(
+    saved_query_id: int,
+    db: asyncpg.Connection = Depends(get_db)
+):
+    """Get a specific saved query."""
+    try:
+        return await fetch_saved_query(db, saved_query_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting saved query: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Error getting saved query"
+        )
+
+@router.patch("/{saved_query_id}", response_model=SavedQueryResponse)
+async def update_saved_query(
+    saved_query_id: int,
+    saved_query: SavedQueryUpdate,
+    db: asyncpg.Connection = Depends(get_db)
+):
+    """Update a saved query."""
+    try:
+        existing = await fetch_saved_query(db, saved_query_id)
+
+        # Build update query dynamically based on provided fields
+        updates = []
+        params = []
+        update_data = saved_query.model_dump(exclude_unset=True)
+
+        for i, (key, value) in enumerate(update_data.items(), start=1):
+            updates.append(f"{key} = ${i}")
+            params.append(value)
+
+        if not updates:
+            return existing
+
+        if update_data.get('connection_id') is not None:
+            await ensure_active_connection(db, update_data['connection_id'])
+
+        # Add saved_query_id as the last parameter
+        params.append(saved_query_id)
+
+        async with db.transaction():
+            await db.execute(f"""
+                UPDATE saved_queries
+                SET {", ".join(updates)}
+                WHERE id = ${len(params)}
+            """, *params)
+
+            # A snapshot of a different query or connection is no longer valid
+            if 'query' in update_data or 'connection_id' in update_data:
+                await db.execute(
+                    "DELETE FROM saved_query_snapshots WHERE saved_query_id = $1",
+                    saved_query_id
+                )
+
+        return await fetch_saved_query(db, saved_query_id)
+    except asyncpg.UniqueViolationError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Saved query with name '{saved_query.name}' already exists"
+        )
+    except asyncpg.ForeignKeyViolationError:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Connection {saved_query.connection_id} not found"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating saved query: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Error updating saved query"
+        )
+
+@router.delete("/{saved_query_id}")
+async def delete_saved_query(
+    saved_query_id: int,
+    db: asyncpg.Connection = Depends(get_db)
+):
+    """Soft delete a saved query and drop its snapshot."""
+    try:
+        async with db.transaction():
+            result = await db.fetchrow("""
+                UPDATE saved_queries
+                SET is_active = false
+                WHERE id = $1 AND is_active = true
+                RETURNING id
+            """, saved_query_id)
+
+            if not result:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Saved query {saved_query_id} not found"
+                )
+
+            await db.execute(
+                "DELETE FROM saved_query_snapshots WHERE saved_query_id = $1",
+                saved_query_id
+            )
+
+        return {"message": "Saved query deleted successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error deleting saved query: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Error deleting saved query"
+        )
+
+@router.get("/{saved_query_id}/results", response_model=SavedQueryResult)
+async def get_saved_query_results(
+    saved_query_id: int,
+    db: asyncpg.Connection = Depends(get_db)
+):
+    """Get the latest snapshot of a saved query without touching the source database."""
+    try:
+        result = await db.fetchrow("""
+            SELECT s.saved_query_id, s.columns, s.data, s.row_count, s.duration_ms,
+                   s.refreshed_at, q.refresh_interval_seconds, q.last_refresh_error,
+                   EXTRACT(EPOCH FROM CURRENT_TIMESTAMP - s.refreshed_at)::float8 AS age_seconds
+            FROM saved_query_snapshots s
+            JOIN saved_queries q ON q.id = s.saved_query_id
+            WHERE s.saved_query_id = $1 AND q.is_active = true
+        """, saved_query_id)
+
+        if not result:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No snapshot for saved query {saved_query_id} yet. Refresh it first."
+            )
+
+        interval = result['refresh_interval_seconds']
+        # Decompressing a large snapshot would otherwise stall every other request
+        rows = await asyncio.to_thread(decode_rows, result['data'])
+        return SavedQueryResult(
+            saved_query_id=result['saved_query_id'],
+            columns=result['columns'],
+            rows=rows,
+            row_count=result['row_count'],
+            duration_ms=result['duration_ms'],
+            refreshed_at=result['refreshed_at'],
+            age_seconds=result['age_seconds'],
+            is_stale=interval is not None and result['age_seconds'] > interval,
+            last_refresh_error=result['last_refresh_error']
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting saved query results: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Error getting saved query results"
+        )
+
+@router.post("/{saved_query_id}/refresh", response_model=SavedQueryResult)
+async def refresh_saved_query_results(
+    saved_query_id: int,
+    db: asyncpg.Connection = Depends(get_db)
+):
+    """Run a saved query now and return the new snapshot."""
+    try:
+        is_refreshed = await saved_query_scheduler.refresh_now(saved_query_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error refreshing saved query {saved_query_id}: {e}")
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+
+    if not is_refreshed:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Saved query {saved_query_id} is already refreshing or changed during the refresh, try again"
+        )
+    return await get_saved_query_results(saved_query_id, db)
@@ -0,0 +1,143 @@
+"""Tests for statement splitting, row capping and the cost gate."""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from utils.query_safety import (
+    apply_row_cap,
+    check_query,
+    is_read_only,
+    plannable_statement,
+    split_statements
+)
+
+class FakePlanner:
+    """Stands in for a connection, answering EXPLAIN with a fixed plan per statement."""
+
+    def __init__(self, plans):
+        self.plans = plans
+        self.explained = []
+
+    async def fetchval(self, sql):
+        statement = sql.removeprefix("EXPLAIN (FORMAT JSON) ")
+        self.explained.append(statement)
+        cost, rows = self.plans[statement]
+        return json.dumps([{"Plan": {"Total Cost": cost, "Plan Rows": rows}}])
+
+@pytest.mark.parametrize("sql, expected", [
+    ("select 1;", ["select 1"]),
+    ("select 1; select 2", ["select 1", "select 2"]),
+    ("select ';' as x", ["select ';' as x"]),
+    ("select 'it''s;'", ["select 'it''s;'"]),
+    ('select 1 as "a;b"', ['select 1 as "a;b"']),
+    ("select $$a;b$$", ["select $$a;b$$"]),
+    ("select $tag$;$tag$ from t where a = $1", ["select $tag$;$tag$ from t where a = $1"]),
+    ("select 1 -- ; comment\n", ["select 1"]),
+    ("/* ; */ select 1;;", ["select 1"]),
+    ("select E'\\';'", ["select E'\\';'"]),
+    ("select e'a\\\\'; select 2", ["select e'a\\\\'", "select 2"]),
+    ("select 'a\\'; select 2", ["select 'a\\'", "select 2"]),
+    ("  ;  ", []),
+])
+def test_split_statements(sql, expected):
+    assert split_statements(sql) == expected
+
+@pytest.mark.parametrize("statement", [
+    "select * from t",
+    "with x as (select 1) select * from x",
+    "values (1), (2)",
+    "table t",
+    "(select 1) union (select 2)",
+    "with x as (select * from t for update) select * from x",
+])
+def test_apply_row_cap_wraps_read_only_statements(statement):
+    assert apply_row_cap(statement, 100) == f"SELECT * FROM ({statement}) AS trove_capped LIMIT 100"
+
+@pytest.mark.parametrize("statement", [
+    "insert into t values (1)",
+    "update t set a = 1",
+    "with x as (delete from t returning *) select * from x",
+    "with x as (select 1) insert into t select * from x",
+    "with x as materialized (update t set a = 1 returning *) select * from x",
+    "select * into z from a",
+    "with x as (select 1) select * into z from x",
+])
+def test_apply_row_cap_leaves_writes_alone(statement):
+    assert apply_row_cap(statement, 100) == statement
+
+def test_is_read_only_ignores_nested_into():
+    assert is_read_only("select 'into' from t where a in (select b from u)")
+
+@pytest.mark.parametrize("statement, expected", [
+    ("select * from a", "select * from a"),
+    ("explain analyze select * from a cross join b", "select * from a cross join b"),
+    ("EXPLAIN (ANALYZE, BUFFERS) delete from t", "delete from t"),
+    ("create table z as select * from a", "create table z as select * from a"),
+    ("create temp table if not exists z (x) as select 1", "create temp table if not exists z (x) as select 1"),
+    ("create materialized view v as select 1", "create materialized view v as select 1"),
+    ("create table t (a int generated always as identity)", None),
+    ("drop table t", None),
+    ("call do_work()", None),
+])
+def test_plannable_statement(statement, expected):
+    assert plannable_statement(statement) == expected
+
+def test_apply_row_cap_without_cap():
+    assert apply_row_cap("select 1", None) == "select 1"
+
+def test_check_query_rejects_multiple_statements():
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(check_query(FakePlanner({}), "select 1; select 2", limits={}))
+    assert exc_info.value.status_code == 400
+
+def test_check_query_applies_tightest_cap():
+    sql = asyncio.run(check_query(FakePlanner({}), "select 1", limits={"max_result_rows": 50}, requested_limit=10))
+    assert sql == "SELECT * FROM (select 1) AS trove_capped LIMIT 10"
+
+def test_check_query_judges_rows_before_cap():
+    capped = "SELECT * FROM (select * from t) AS trove_capped LIMIT 10000"
+    planner = FakePlanner({"select * from t": (5000.0, 1000000), capped: (50.0, 10000)})
+    limits = {"max_result_rows": 10000, "max_query_rows": 100000, "max_query_cost": 1000.0}
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(check_query(planner, "select * from t", limits=limits))
+    assert exc_info.value.status_code == 400
+    assert "estimated rows" in exc_info.value.detail
+    assert "estimated cost" not in exc_info.value.detail
+
+def test_check_query_confirmation():
+    planner = FakePlanner({"delete from t": (5000.0, 10)})
+    limits = {"max_query_cost": 1000.0, "cost_gate_action": "confirm"}
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(check_query(planner, "delete from t", limits=limits))
+    assert exc_info.value.status_code == 409
+    assert asyncio.run(check_query(planner, "delete from t", limits=limits, is_confirmed=True)) == "delete from t"
+
+def test_check_query_plans_inside_explain_analyze():
+    planner = FakePlanner({"select * from a cross join b": (1e9, 1e12)})
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(check_query(planner, "explain analyze select * from a cross join b", limits={"max_query_cost": 1000.0}))
+    assert exc_info.value.status_code == 400
+    assert planner.explained == ["select * from a cross join b"]
+
+def test_check_query_plans_create_table_as():
+    statement = "create table z as select * from a cross join b"
+    planner = FakePlanner({statement: (1e9, 1e12)})
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(check_query(planner, statement, limits={"max_query_cost": 1000.0}))
+    assert exc_info.value.status_code == 400
+    assert planner.explained == [statement]
+
+def test_check_query_holds_back_unplannable_statements():
+    planner = FakePlanner({})
+    limits = {"max_query_cost": 1000.0, "cost_gate_action": "confirm"}
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(check_query(planner, "call do_work()", limits=limits))
+    assert exc_info.value.status_code == 409
+    assert asyncio.run(check_query(planner, "call do_work()", limits=limits, is_confirmed=True)) == "call do_work()"
+    assert planner.explained == []
+
+def test_check_query_skips_gate_without_thresholds():
+    assert asyncio.run(check_query(FakePlanner({}), "call do_work()", limits={})) == "call do_work()"
@@ -0,0 +1,98 @@
+"""Tests for replica ranking, load tracking and health cooldowns."""
+
+import pytest
+
+from utils import replica_balancer as balancer_module
+from utils.replica_balancer import (
+    LATENCY_MAX_AGE_SECONDS,
+    LATENCY_SMOOTHING,
+    UNHEALTHY_COOLDOWN_SECONDS,
+    ReplicaBalancer
+)
+
+FAST = ("replica-fast", 5432)
+SLOW = ("replica-slow", 5432)
+
+class FakeClock:
+    """Controllable replacement for time.monotonic."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(balancer_module.time, "monotonic", fake)
+    return fake
+
+def test_least_outstanding_prefers_idle_host(clock):
+    balancer = ReplicaBalancer()
+    balancer.acquire(FAST)
+    assert balancer.rank([FAST, SLOW]) == [SLOW, FAST]
+    balancer.release(FAST)
+    balancer.record_latency(FAST, 0.001)
+    balancer.record_latency(SLOW, 0.1)
+    assert balancer.rank([SLOW, FAST]) == [FAST, SLOW]
+
+def test_latency_prefers_fast_host(clock):
+    balancer = ReplicaBalancer()
+    balancer.record_latency(FAST, 0.01)
+    balancer.record_latency(SLOW, 0.05)
+    assert balancer.rank([SLOW, FAST], strategy="latency") == [FAST, SLOW]
+
+def test_latency_spreads_load_when_fast_host_is_busy(clock):
+    balancer = ReplicaBalancer()
+    balancer.record_latency(FAST, 0.01)
+    balancer.record_latency(SLOW, 0.03)
+    for _ in range(3):
+        balancer.acquire(FAST)
+    assert balancer.rank([FAST, SLOW], strategy="latency") == [SLOW, FAST]
+
+def test_latency_remeasures_stale_hosts(clock):
+    balancer = ReplicaBalancer()
+    balancer.record_latency(SLOW, 1.0)
+    clock.now += 10
+    balancer.record_latency(FAST, 0.01)
+    assert balancer.rank([SLOW, FAST], strategy="latency") == [FAST, SLOW]
+
+    # Once SLOW's only sample is stale it ranks as unmeasured and gets probed again
+    clock.now += LATENCY_MAX_AGE_SECONDS - 5
+    assert balancer.rank([FAST, SLOW], strategy="latency") == [SLOW, FAST]
+
+def test_unmeasured_hosts_rank_first(clock):
+    balancer = ReplicaBalancer()
+    balancer.record_latency(FAST, 0.01)
+    assert balancer.rank([FAST, SLOW], strategy="latency") == [SLOW, FAST]
+
+def test_unhealthy_host_skipped_until_cooldown_ends(clock):
+    balancer = ReplicaBalancer()
+    balancer.mark_unhealthy(FAST)
+    assert balancer.rank([FAST, SLOW]) == [SLOW]
+    clock.now += UNHEALTHY_COOLDOWN_SECONDS + 1
+    assert balancer.rank([FAST, SLOW]) == [FAST, SLOW]
+
+def test_release_never_goes_below_zero(clock):
+    balancer = ReplicaBalancer()
+    balancer.release(FAST)
+    balancer.acquire(FAST)
+    # Had the stray release counted, FAST would now tie with the idle SLOW at zero
+    assert balancer.rank([FAST, SLOW]) == [SLOW, FAST]
+    balancer.release(FAST)
+    balancer.release(FAST)
+    assert balancer._outstanding[FAST] == 0
+
+def test_record_latency_moving_average(clock):
+    balancer = ReplicaBalancer()
+    balancer.record_latency(FAST, 0.1)
+    balancer.record_latency(FAST, 0.2)
+    assert balancer._latency[FAST] == pytest.approx(LATENCY_SMOOTHING * 0.2 + (1 - LATENCY_SMOOTHING) * 0.1)
+
+def test_record_latency_restarts_after_stale_sample(clock):
+    balancer = ReplicaBalancer()
+    balancer.record_latency(FAST, 1.0)
+    clock.now += LATENCY_MAX_AGE_SECONDS + 1
+    balancer.record_latency(FAST, 0.01)
+    assert balancer._latency[FAST] == pytest.approx(0.01)
@@ -0,0 +1,83 @@
+"""Tests for snapshot encoding and saved query scheduling."""
+
+import asyncio
+import datetime
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+
+from utils import saved_query_scheduler as scheduler_module
+from utils.saved_query_scheduler import SavedQueryScheduler, decode_rows, encode_rows
+
+class FakeInternalConnection:
+    """Stands in for the internal database, returning a fixed list of due saved queries."""
+
+    def __init__(self, due):
+        self.due = due
+        self.is_closed = False
+
+    async def fetch(self, sql):
+        return self.due
+
+    async def close(self):
+        self.is_closed = True
+
+def test_encode_rows_round_trip_matches_live_results():
+    row = [
+        Decimal("12.50"),
+        datetime.datetime(2024, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+        datetime.date(2024, 1, 2),
+        None,
+        "text",
+    ]
+    decoded = decode_rows(encode_rows([row]))
+    assert decoded == [jsonable_encoder(row)]
+    assert decoded == [[12.5, "2024-01-02T03:04:05+00:00", "2024-01-02", None, "text"]]
+
+def test_schedule_due_skips_in_flight_and_retrying_queries(monkeypatch):
+    connection = FakeInternalConnection([
+        {"id": 1, "refresh_interval_seconds": 60},
+        {"id": 2, "refresh_interval_seconds": 60},
+        {"id": 3, "refresh_interval_seconds": 60},
+    ])
+    refreshed = []
+
+    async def get_internal_connection():
+        return connection
+
+    async def refresh_saved_query(saved_query_id):
+        refreshed.append(saved_query_id)
+        return True
+
+    monkeypatch.setattr(scheduler_module.connection_manager, "get_internal_connection", get_internal_connection)
+    monkeypatch.setattr(scheduler_module, "refresh_saved_query", refresh_saved_query)
+
+    async def run():
+        scheduler = SavedQueryScheduler(concurrency=2)
+        scheduler._in_flight.add(1)
+        scheduler._retry_after[2] = scheduler_module.time.monotonic() + 3600
+        await scheduler._schedule_due()
+        await asyncio.gather(*scheduler._tasks)
+        return scheduler
+
+    scheduler = asyncio.run(run())
+    assert refreshed == [3]
+    assert connection.is_closed
+    assert scheduler._in_flight == {1}
+
+def test_failed_refresh_waits_one_interval(monkeypatch):
+    async def refresh_saved_query(saved_query_id):
+        raise RuntimeError("source database is down")
+
+    monkeypatch.setattr(scheduler_module, "refresh_saved_query", refresh_saved_query)
+
+    async def run():
+        scheduler = SavedQueryScheduler()
+        scheduler._in_flight.add(7)
+        before = scheduler_module.time.monotonic()
+        await scheduler._refresh(7, 300)
+        return scheduler, before
+
+    scheduler, before = asyncio.run(run())
+    assert 7 not in scheduler._in_flight
+    assert scheduler._retry_after[7] >= before + 300
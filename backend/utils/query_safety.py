@@ -0,0 +1,240 @@
+"""Pre-execution safety checks for user queries: statement parsing, cost gate and row cap."""
+
+import json
+import logging
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import asyncpg
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+# Statements PostgreSQL can EXPLAIN without executing them
+EXPLAINABLE_KEYWORDS = ('select', 'with', 'values', 'table', 'insert', 'update', 'delete', 'merge')
+
+# Statements that only read, and can be wrapped in a subquery to cap their rows
+READ_ONLY_KEYWORDS = ('select', 'with', 'values', 'table')
+
+# A write right after a parenthesis: a data-modifying CTE body or the main statement of a WITH
+DATA_MODIFYING_WITH = re.compile(r'[()]\s*(insert|update|delete|merge)\b', re.IGNORECASE)
+
+# SELECT ... INTO creates a table, so it is a write even though it starts like a read
+TOP_LEVEL_INTO = re.compile(r'\binto\b', re.IGNORECASE)
+
+# EXPLAIN prefix, with either parenthesized or bare options
+EXPLAIN_PREFIX = re.compile(
+    r'^\s*explain\s+(?:\([^()]*\)\s*|(?:(?:analyze|analyse|verbose)\s+)*)',
+    re.IGNORECASE
+)
+
+# CREATE TABLE ... AS and CREATE MATERIALIZED VIEW ... AS, which EXPLAIN plans without creating anything
+CREATE_AS = re.compile(
+    r'^\s*create\s+(?:(?:(?:global|local)\s+)?(?:temp|temporary|unlogged)\s+)?(?:table|materialized\s+view)\s+'
+    r'(?:if\s+not\s+exists\s+)?[^\s(]+\s*(?:\([^()]*\)\s*)?(?:using\s+\S+\s+)?(?:with\s*\([^()]*\)\s*)?'
+    r'(?:on\s+commit\s+(?:preserve\s+rows|delete\s+rows|drop)\s+)?(?:tablespace\s+\S+\s+)?as\b',
+    re.IGNORECASE
+)
+
+def _is_identifier_char(char: str) -> bool:
+    return char.isalnum() or char in ('_', '$')
+
+def _tokenize(sql: str) -> Iterator[Tuple[str, str]]:
+    """Yield (kind, text) chunks of SQL, kind being code, literal, comment or semicolon.
+
+    Handles single-quoted strings (including E'' backslash escapes), quoted
+    identifiers, dollar-quoted bodies and both comment styles.
+    """
+    i = 0
+    length = len(sql)
+    while i < length:
+        char = sql[i]
+        if char in ("'", '"'):
+            # E'...' strings treat backslash as an escape character
+            has_escapes = (
+                char == "'" and i > 0 and sql[i - 1] in 'eE'
+                and (i < 2 or not _is_identifier_char(sql[i - 2]))
+            )
+            end = i + 1
+            while end < length:
+                if has_escapes and sql[end] == '\\':
+                    end += 2
+                    continue
+                if sql[end] == char:
+                    # Doubled quote is an escaped quote
+                    if end + 1 < length and sql[end + 1] == char:
+                        end += 2
+                        continue
+                    break
+                end += 1
+            yield 'literal', sql[i:end + 1]
+            i = end + 1
+        elif sql.startswith('--', i):
+            end = sql.find('\n', i)
+            end = length if end == -1 else end
+            yield 'comment', sql[i:end]
+            i = end
+        elif sql.startswith('/*', i):
+            end = sql.find('*/', i + 2)
+            end = length if end == -1 else end + 2
+            yield 'comment', sql[i:end]
+            i = end
+        elif char == '$' and (i == 0 or not _is_identifier_char(sql[i - 1])):
+            end_tag = sql.find('$', i + 1)
+            tag = sql[i:end_tag + 1] if end_tag != -1 else ''
+            if tag and (tag == '$$' or tag[1:-1].replace('_', 'a').isalnum() and not tag[1].isdigit()):
+                close = sql.find(tag, end_tag + 1)
+                end = length if close == -1 else close + len(tag)
+                yield 'literal', sql[i:end]
+                i = end
+            else:
+                yield 'code', char
+                i += 1
+        elif char == ';':
+            yield 'semicolon', char
+            i += 1
+        else:
+            yield 'code', char
+            i += 1
+
+def split_statements(sql: str) -> List[str]:
+    """Split SQL into statements on top-level semicolons.
+
+    Semicolons inside strings, quoted identifiers, dollar quotes and comments
+    don't split. Comments are dropped and empty statements are skipped.
+    """
+    statements = []
+    current = []
+    for kind, text in _tokenize(sql):
+        if kind == 'semicolon':
+            statements.append(''.join(current).strip())
+            current = []
+        elif kind == 'comment':
+            current.append(' ')
+        else:
+            current.append(text)
+    statements.append(''.join(current).strip())
+    return [statement for statement in statements if statement]
+
+def first_keyword(statement: str) -> str:
+    """Return the lowercased leading keyword of a statement."""
+    stripped = statement.lstrip('( \t\r\n')
+    return stripped.split(None, 1)[0].lower() if stripped else ''
+
+def _top_level_code(statement: str) -> str:
+    """Return the code of a statement outside any parentheses, literals and comments."""
+    depth = 0
+    chars = []
+    for kind, text in _tokenize(statement):
+        if kind != 'code':
+            chars.append(' ')
+        elif text == '(':
+            depth += 1
+            chars.append(' ')
+        elif text == ')':
+            depth = max(depth - 1, 0)
+            chars.append(' ')
+        else:
+            chars.append(text if depth == 0 else ' ')
+    return ''.join(chars)
+
+def is_read_only(statement: str) -> bool:
+    """Whether a statement only reads, so it can run as a subquery."""
+    keyword = first_keyword(statement)
+    if keyword not in READ_ONLY_KEYWORDS:
+        return False
+    if TOP_LEVEL_INTO.search(_top_level_code(statement)):
+        return False
+    if keyword != 'with':
+        return True
+    # Postgres only accepts data-modifying WITH at the top level
+    code = ''.join(text for kind, text in _tokenize(statement) if kind == 'code')
+    return DATA_MODIFYING_WITH.search(code) is None
+
+def plannable_statement(statement: str) -> Optional[str]:
+    """Return the statement EXPLAIN should plan, or None if its cost can't be estimated.
+
+    An EXPLAIN prefix is stripped so EXPLAIN ANALYZE is judged on the statement it runs.
+    """
+    match = EXPLAIN_PREFIX.match(statement)
+    while match:
+        statement = statement[match.end():]
+        match = EXPLAIN_PREFIX.match(statement)
+    if first_keyword(statement) in EXPLAINABLE_KEYWORDS or CREATE_AS.match(statement):
+        return statement
+    return None
+
+def apply_row_cap(statement: str, row_cap: Optional[int]) -> str:
+    """Wrap a read-only statement so the server returns at most row_cap rows."""
+    if not row_cap or row_cap <= 0 or not is_read_only(statement):
+        return statement
+    return f"SELECT * FROM ({statement}) AS trove_capped LIMIT {int(row_cap)}"
+
+async def estimate_cost(conn: asyncpg.Connection, statement: str) -> Dict[str, float]:
+    """Plan a statement with EXPLAIN (no execution) and return its estimated cost and rows."""
+    plan_json = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {statement}")
+    # asyncpg returns json columns as text unless a codec is registered
+    plan = json.loads(plan_json) if isinstance(plan_json, str) else plan_json
+    root = plan[0]['Plan']
+    return {"cost": float(root['Total Cost']), "rows": float(root['Plan Rows'])}
+
+async def check_query(
+    conn: asyncpg.Connection,
+    sql: str,
+    limits: Dict[str, Any],
+    requested_limit: Optional[int] = None,
+    is_confirmed: bool = False
+) -> str:
+    """Validate a user query against the connection's limits and return the SQL to execute.
+
+    Raises HTTPException when the query is empty, has several statements, or its
+    estimated cost/rows exceed the thresholds (409 if it may run once confirmed).
+    With a threshold set, statements that can't be planned are held back the same way.
+    """
+    statements = split_statements(sql)
+    if not statements:
+        raise HTTPException(status_code=400, detail="Query is empty")
+    if len(statements) > 1:
+        raise HTTPException(status_code=400, detail="Only one statement can be run per query")
+    statement = statements[0]
+
+    # Server-side row cap: the tighter of the caller's limit and the connection's cap
+    caps = [cap for cap in (requested_limit, limits.get('max_result_rows')) if cap and cap > 0]
+    capped = apply_row_cap(statement, min(caps) if caps else None)
+
+    max_cost = limits.get('max_query_cost')
+    max_rows = limits.get('max_query_rows')
+    if max_cost is None and max_rows is None:
+        return capped
+
+    violations = []
+    planned = plannable_statement(statement)
+    if planned is None:
+        # Anything the gate can't judge is held back rather than let through
+        violations.append(f"cost of {first_keyword(statement).upper()} statements can't be estimated")
+    else:
+        # Rows are judged on the query as written, since the cap's Limit node would hide
+        # them; cost is judged on what will actually run
+        capped_estimate = None
+        if max_cost is not None:
+            capped_estimate = await estimate_cost(conn, capped if capped != statement else planned)
+            if capped_estimate['cost'] > max_cost:
+                violations.append(f"estimated cost {capped_estimate['cost']:.0f} exceeds limit {max_cost:.0f}")
+        if max_rows is not None:
+            estimate = capped_estimate
+            if estimate is None or capped != statement:
+                estimate = await estimate_cost(conn, planned)
+            if estimate['rows'] > max_rows:
+                violations.append(f"estimated rows {estimate['rows']:.0f} exceed limit {max_rows}")
+    if not violations:
+        return capped
+
+    logger.warning(f"Query over cost gate: {'; '.join(violations)}")
+    if limits.get('cost_gate_action') == 'confirm':
+        if is_confirmed:
+            return capped
+        raise HTTPException(
+            status_code=409,
+            detail=f"Query needs confirmation: {'; '.join(violations)}. Resend with confirmed=true to run it."
+        )
+    raise HTTPException(status_code=400, detail=f"Query rejected: {'; '.join(violations)}")
@@ -0,0 +1,76 @@
+"""Replica selection for spreading read-only traffic across database hosts."""
+
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest sample in the latency moving average
+LATENCY_SMOOTHING = 0.3
+
+# How long a replica that failed or lagged is skipped before being retried
+UNHEALTHY_COOLDOWN_SECONDS = 30.0
+
+# Latency samples older than this are ignored, so the host gets measured again
+LATENCY_MAX_AGE_SECONDS = 60.0
+
+HostKey = Tuple[str, int]
+
+class ReplicaBalancer:
+    """Tracks in-flight requests and latency per replica host and picks the best one.
+
+    State is kept in-process, so each backend worker balances independently.
+    """
+
+    def __init__(self):
+        self._outstanding: Dict[HostKey, int] = {}
+        self._latency: Dict[HostKey, float] = {}
+        self._latency_sampled_at: Dict[HostKey, float] = {}
+        self._unhealthy_until: Dict[HostKey, float] = {}
+
+    def rank(self, hosts: List[HostKey], strategy: str = "least_outstanding") -> List[HostKey]:
+        """Order candidate hosts from most to least preferred, skipping unhealthy ones."""
+        now = time.monotonic()
+        healthy = [key for key in hosts if self._unhealthy_until.get(key, 0.0) <= now]
+
+        # Hosts without a recent latency sample count as 0 and sort first so they get measured
+        def latency(key: HostKey) -> float:
+            if now - self._latency_sampled_at.get(key, float('-inf')) > LATENCY_MAX_AGE_SECONDS:
+                return 0.0
+            return self._latency[key]
+
+        if strategy == "latency":
+            # Expected wait behind the requests already queued, so a fast host gets busy before it is avoided
+            return sorted(healthy, key=lambda key: (
+                latency(key) * (self._outstanding.get(key, 0) + 1), self._outstanding.get(key, 0)
+            ))
+        return sorted(healthy, key=lambda key: (self._outstanding.get(key, 0), latency(key)))
+
+    def acquire(self, key: HostKey) -> None:
+        """Record a request starting on a host."""
+        self._outstanding[key] = self._outstanding.get(key, 0) + 1
+
+    def release(self, key: HostKey) -> None:
+        """Record a request finishing on a host."""
+        self._outstanding[key] = max(self._outstanding.get(key, 0) - 1, 0)
+
+    def record_latency(self, key: HostKey, seconds: float) -> None:
+        """Fold a round-trip sample into the host's moving average."""
+        now = time.monotonic()
+        previous: Optional[float] = self._latency.get(key)
+        is_stale = now - self._latency_sampled_at.get(key, float('-inf')) > LATENCY_MAX_AGE_SECONDS
+        self._latency_sampled_at[key] = now
+        # A stale average says little about the host now, so start over from this sample
+        if previous is None or is_stale:
+            self._latency[key] = seconds
+            return
+        self._latency[key] = LATENCY_SMOOTHING * seconds + (1 - LATENCY_SMOOTHING) * previous
+
+    def mark_unhealthy(self, key: HostKey) -> None:
+        """Take a host out of rotation for the cooldown period."""
+        logger.warning(f"Replica {key[0]}:{key[1]} marked unhealthy for {UNHEALTHY_COOLDOWN_SECONDS}s")
+        self._unhealthy_until[key] = time.monotonic() + UNHEALTHY_COOLDOWN_SECONDS
+
+# Global instance
+replica_balancer = ReplicaBalancer()
@@ -0,0 +1,206 @@
+"""Background refresh of saved query snapshots."""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Set
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from utils.connection_manager import connection_manager
+from utils.query_safety import check_query
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of saved queries refreshed at the same time
+REFRESH_CONCURRENCY = int(os.getenv("TROVE_REFRESH_CONCURRENCY", "4"))
+
+# How often the scheduler looks for saved queries that are due
+REFRESH_POLL_SECONDS = int(os.getenv("TROVE_REFRESH_POLL_SECONDS", "30"))
+
+# Namespace for the advisory lock taken while a saved query refreshes
+REFRESH_LOCK_NAMESPACE = 28001
+
+def encode_rows(rows: List[List[Any]]) -> bytes:
+    """Serialize result rows to compressed JSON, encoded the same way as live query results."""
+    return zlib.compress(json.dumps(jsonable_encoder(rows), separators=(',', ':')).encode())
+
+def decode_rows(data: bytes) -> List[List[Any]]:
+    """Deserialize result rows stored by encode_rows."""
+    return json.loads(zlib.decompress(data))
+
+async def refresh_saved_query(saved_query_id: int) -> bool:
+    """Run a saved query against its source database and store the result as its snapshot.
+
+    Returns False if the query is already being refreshed, or was edited or deleted
+    while it ran, in which case no snapshot is stored.
+    """
+    internal = await connection_manager.get_internal_connection()
+    try:
+        saved = await internal.fetchrow("""
+            SELECT connection_id, query
+            FROM saved_queries
+            WHERE id = $1 AND is_active = true
+        """, saved_query_id)
+        if not saved:
+            raise HTTPException(status_code=404, detail=f"Saved query {saved_query_id} not found")
+
+        # Held until the internal connection closes, so refreshes never overlap
+        is_locked = await internal.fetchval(
+            "SELECT pg_try_advisory_lock($1, $2)", REFRESH_LOCK_NAMESPACE, saved_query_id
+        )
+        if not is_locked:
+            logger.info(f"Saved query {saved_query_id} is already refreshing, skipping")
+            return False
+
+        started = time.monotonic()
+        try:
+            config = await connection_manager.get_user_connection_config(saved['connection_id'])
+            conn = await connection_manager.get_user_connection(
+                saved['connection_id'], read_only=True, config=config
+            )
+            try:
+                # Saving the query counts as confirming it; hard rejections and the row cap still apply
+                query_to_execute = await check_query(conn, saved['query'], limits=config, is_confirmed=True)
+                results = await conn.fetch(query_to_execute)
+            finally:
+                await conn.close()
+        except Exception as e:
+            error = e.detail if isinstance(e, HTTPException) else str(e)
+            await internal.execute("""
+                UPDATE saved_queries SET last_refresh_error = $1
+                WHERE id = $2 AND query = $3 AND last_refresh_error IS DISTINCT FROM $1
+            """, error, saved_query_id, saved['query'])
+            raise
+        duration_ms = int((time.monotonic() - started) * 1000)
+
+        columns = list(results[0].keys()) if results else []
+        data = await asyncio.to_thread(encode_rows, [list(row.values()) for row in results])
+
+        async with internal.transaction():
+            # Lock the row so an edit either waits for this snapshot (and then deletes it)
+            # or has already landed, in which case these results are for the old query
+            current = await internal.fetchrow("""
+                SELECT connection_id, query
+                FROM saved_queries
+                WHERE id = $1 AND is_active = true
+                FOR UPDATE
+            """, saved_query_id)
+            if (
+                current is None
+                or current['query'] != saved['query']
+                or current['connection_id'] != saved['connection_id']
+            ):
+                logger.info(f"Saved query {saved_query_id} changed while refreshing, discarding results")
+                return False
+
+            await internal.execute("""
+                INSERT INTO saved_query_snapshots
+                    (saved_query_id, columns, data, row_count, duration_ms, refreshed_at)
+                VALUES ($1, $2, $3, $4, $5, CURRENT_TIMESTAMP)
+                ON CONFLICT (saved_query_id) DO UPDATE SET
+                    columns = EXCLUDED.columns,
+                    data = EXCLUDED.data,
+                    row_count = EXCLUDED.row_count,
+                    duration_ms = EXCLUDED.duration_ms,
+                    refreshed_at = EXCLUDED.refreshed_at
+            """, saved_query_id, columns, data, len(results), duration_ms)
+            await internal.execute("""
+                UPDATE saved_queries SET last_refresh_error = NULL
+                WHERE id = $1 AND last_refresh_error IS NOT NULL
+            """, saved_query_id)
+        logger.info(f"Refreshed saved query {saved_query_id}: {len(results)} rows in {duration_ms}ms")
+        return True
+    finally:
+        await internal.close()
+
+class SavedQueryScheduler:
+    """Periodically refreshes saved queries whose snapshot is older than their interval."""
+
+    def __init__(self, concurrency: int = REFRESH_CONCURRENCY, poll_seconds: int = REFRESH_POLL_SECONDS):
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop_task: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._in_flight: Set[int] = set()
+        # Failed queries wait a full interval before the next attempt
+        self._retry_after: Dict[int, float] = {}
+
+    def start(self) -> None:
+        """Start the scheduler loop on the running event loop."""
+        if self._loop_task is not None:
+            return
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._loop_task = asyncio.create_task(self._run())
+        logger.info(f"Saved query scheduler started (concurrency {self.concurrency})")
+
+    async def stop(self) -> None:
+        """Cancel the scheduler loop and any refreshes in progress."""
+        tasks = list(self._tasks)
+        if self._loop_task is not None:
+            tasks.append(self._loop_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = None
+        self._tasks.clear()
+        self._in_flight.clear()
+
+    async def refresh_now(self, saved_query_id: int) -> bool:
+        """Refresh a saved query immediately, sharing the scheduler's concurrency limit."""
+        if self._semaphore is None:
+            return await refresh_saved_query(saved_query_id)
+        async with self._semaphore:
+            return await refresh_saved_query(saved_query_id)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._schedule_due()
+            except Exception as e:
+                logger.error(f"Error scheduling saved query refreshes: {e}", exc_info=True)
+            await asyncio.sleep(self.poll_seconds)
+
+    async def _schedule_due(self) -> None:
+        conn = await connection_manager.get_internal_connection()
+        try:
+            due = await conn.fetch("""
+                SELECT q.id, q.refresh_interval_seconds
+                FROM saved_queries q
+                JOIN database_connections c ON c.id = q.connection_id AND c.is_active = true
+                LEFT JOIN saved_query_snapshots s ON s.saved_query_id = q.id
+                WHERE q.is_active = true
+                  AND q.refresh_interval_seconds IS NOT NULL
+                  AND (s.refreshed_at IS NULL
+                       OR s.refreshed_at + make_interval(secs => q.refresh_interval_seconds) <= CURRENT_TIMESTAMP)
+                ORDER BY s.refreshed_at NULLS FIRST
+            """)
+        finally:
+            await conn.close()
+
+        now = time.monotonic()
+        for row in due:
+            saved_query_id = row['id']
+            if saved_query_id in self._in_flight or self._retry_after.get(saved_query_id, 0.0) > now:
+                continue
+            self._in_flight.add(saved_query_id)
+            task = asyncio.create_task(self._refresh(saved_query_id, row['refresh_interval_seconds']))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, saved_query_id: int, interval_seconds: int) -> None:
+        try:
+            await self.refresh_now(saved_query_id)
+            self._retry_after.pop(saved_query_id, None)
+        except Exception as e:
+            logger.error(f"Failed to refresh saved query {saved_query_id}: {e}")
+            self._retry_after[saved_query_id] = time.monotonic() + interval_seconds
+        finally:
+            self._in_flight.discard(saved_query_id)
+
+# Global instance
+saved_query_scheduler = SavedQueryScheduler()